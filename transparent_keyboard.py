@@ -1,11 +1,17 @@
 #!/usr/bin/env python3
 import tkinter as tk
 from tkinter import ttk
+from tkinter import font as tkfont
 import sys
 import transparent_keyboard_settings as settings
-import subprocess
-import pyperclip
 import argparse
+from Xlib import X, XK
+from Xlib import display as xdisplay
+from Xlib.ext import xtest
+
+# Layout dimensions derived once from the key table
+_NUM_ROWS = settings.KEY_TABLE[-1][1] + 1  # Number of key rows
+_MAX_COLS = max(column for _, _, column, _ in settings.KEY_TABLE) + 1  # Uniform grid columns
 
 class TransparentKeyboard(tk.Tk):
     """
@@ -28,9 +34,8 @@ class TransparentKeyboard(tk.Tk):
     Attributes:
         text_var (tk.StringVar): Stores the current input text
         caps_lock_on (bool): Tracks the state of caps lock
-        buttons (List[List[tk.Button]]): 2D array of keyboard buttons
-        current_row (int): Currently focused row in keyboard navigation
-        current_col (int): Currently focused column in keyboard navigation
+        buttons (List[List[ttk.Button]]): 2D array of keyboard buttons
+        button_columns (List[List[int]]): Grid column of each button in buttons
     """
     
     def __init__(self):
@@ -40,53 +45,44 @@ class TransparentKeyboard(tk.Tk):
         # Set window properties
         self.title("Virtual Keyboard")
         
-        def on_escape(event: tk.Event) -> None:
-            """Handle escape key press to close the window."""
-            print("Escape key pressed")  # Debug print
-            self.destroy()
-        
         # Bind escape key to close the program
-        self.bind('<Escape>', on_escape)
-        self.bind_all('<Escape>', on_escape)  # Bind to all widgets
+        self.bind_all('<Escape>', self.on_escape)  # Bind to all widgets
         
         # Bind arrow keys and enter for navigation
-        self.bind_all('<Left>', lambda e: self.move_focus('left'))
-        self.bind_all('<Right>', lambda e: self.move_focus('right'))
-        self.bind_all('<Up>', lambda e: self.move_focus('up'))
-        self.bind_all('<Down>', lambda e: self.move_focus('down'))
-        self.bind_all('<Return>', lambda e: self.activate_focused())
+        self.bind_all('<Left>', self._on_left)
+        self.bind_all('<Right>', self._on_right)
+        self.bind_all('<Up>', self._on_up)
+        self.bind_all('<Down>', self._on_down)
+        self.bind_all('<Return>', self.activate_focused)
+        
+        # Special keys and their handlers; any other key is typed as text
+        self._handlers = {
+            '⨯': self._cancel_and_exit,  # Cancel
+            '⌫': self._backspace,
+            '⎵': self._space,
+            '⇪': self.toggle_caps_lock,
+            '↵': self._commit_and_exit,  # Return key
+        }
         
         # Variables for window dragging
         self._drag_data = {"x": 0, "y": 0, "dragging": False}
+        self._pending_geom = None  # Window position waiting to be applied
+        self._geom_scheduled = False
         
         # Get screen dimensions
         screen_width = self.winfo_screenwidth()
         screen_height = self.winfo_screenheight()
         
-        # Simplified QWERTY layout with Done and Cancel buttons
-        self.keys = [
-            ['1', '2', '3', '4', '5', '6', '7', '8', '9', '0', '⌫'],
-            ['Q', 'W', 'E', 'R', 'T', 'Y', 'U', 'I', 'O', 'P'],
-            ['⇪', 'A', 'S', 'D', 'F', 'G', 'H', 'J', 'K', 'L', '↵'],
-            ['Z', 'X', 'C', 'V', 'B', 'N', 'M', '⨯'],
-            ['⎵']
-            
-              # Cancel takes 3 columns, Done takes 9
-        ]
-        
-        # Calculate window height based on the number of key rows and desired key height
-        key_height = 60  # Increased from 40 to 60
-        window_height = len(self.keys) * key_height + 80  # Increased padding from 50 to 80 for text display
-        
-        # Calculate window width
-        window_width = int(screen_width * settings.KEYBOARD_WIDTH_RATIO)
+        # Configure the shared key button styles
+        self._configure_styles()
         
-        # Calculate position for center of screen
-        x = (screen_width - window_width) // 2
-        y = (screen_height - window_height) // 2
+        # Calculate the size needed by all widgets from the settings
+        required_width, required_height = self._required_size()
         
-        # Set window size and position
-        self.geometry(f"{window_width}x{window_height}+{x}+{y}")
+        # Set window size and center it on screen
+        x = (screen_width - required_width) // 2
+        y = (screen_height - required_height) // 2
+        self.geometry(f"{required_width}x{required_height}+{x}+{y}")
         
         # Configure window style for transparency
         if sys.platform.startswith('linux'):
@@ -100,6 +96,14 @@ class TransparentKeyboard(tk.Tk):
 
         # Add text display at the top
         self.text_var = tk.StringVar()
+        self._pending_text = None  # Text waiting to be flushed to text_var
+        self._flush_scheduled = False
+        
+        # X display connection used to send the paste shortcut, opened on first use
+        self._xdisplay = None
+        self._paste_keycodes = None
+        self._exiting = False  # Set once Return or Cancel starts closing the keyboard
+        
         self.text_display = tk.Entry(self.main_frame, 
                                    textvariable=self.text_var,
                                    font=(settings.KEY_FONT_FAMILY, settings.KEY_FONT_SIZE),
@@ -124,178 +128,250 @@ class TransparentKeyboard(tk.Tk):
         
         # Store buttons in a 2D array for navigation
         self.buttons = []
-        self.current_row = 0
-        self.current_col = 0
+        self.button_columns = []  # Grid column of each button, parallel to self.buttons
+        self._key_of = {}  # Button -> key it was created for
+        self._index_of = {}  # Button -> index in self._flat
+        self._letter_keys = {}  # Letter key button -> key, for caps lock updates
+        self._flat = []  # Buttons in row-major order
+        self._focus_idx = 0  # Index of the focused button in self._flat
         
         # Configure grid columns to be uniform
-        max_cols = max(len(row) for row in self.keys)
-        for i in range(max_cols):
+        for i in range(_MAX_COLS):
             self.keyboard_frame.grid_columnconfigure(i, weight=1, uniform='key')
         
         # Create and place buttons
         self.create_keyboard()
-        
-        # Update window size to fit all widgets
-        self.update_idletasks()  # Ensure all widgets are rendered
-        required_width = self.main_frame.winfo_reqwidth()
-        required_height = self.main_frame.winfo_reqheight()
-        
-        # Add padding (more vertical padding)
-        required_width += 20
-        required_height += 60  # Increased from 20 to 60 for more vertical space
-        
-        # Update window size and center it on screen
-        x = (screen_width - required_width) // 2
-        y = (screen_height - required_height) // 2
-        self.geometry(f"{required_width}x{required_height}+{x}+{y}")
+        self._build_focus_tables()
         
         # Set initial focus
-        if self.buttons and self.buttons[0]:
-            self.buttons[0][0].configure(bg=settings.KEY_HOVER_COLOR)
+        if self._flat:
+            self._apply_focus()
         
         # Focus window once at the end
         self.focus_force()
         
+        # Precompute the alpha values for the fade in effect
+        target_alpha = settings.WINDOW_TRANSPARENCY
+        self._fade_steps = [round(i * 0.05, 2) for i in range(1, int(target_alpha / 0.05) + 1)]
+        self._fade_steps.append(target_alpha)
+        self._fade_idx = 0
+        self._fade_job = None
+        self._fade_cmd = self.register(self._fade_step)  # Tcl command reused for every frame
+        
         # Start fade in effect
         self.fade_in()
         
         # Add a state variable for Caps Lock
         self.caps_lock_on = False
+
+    def _required_size(self) -> tuple:
+        """
+        Calculate the window size needed to fit the text display and all keys.
         
-        # Ensure initial keyboard layout is lowercase
-        self.update_keyboard_layout()
+        The size follows from the font metrics and the key styles without
+        laying out the widgets first. In the 'default' theme a key button is
+        its label plus the style padding, border and focus ring; the buttons
+        are created with default='disabled' so no default ring is reserved.
+        Each key is measured with the font of its own style. Every uniform grid
+        column is as wide as the widest single-width key, and a wide key in
+        the last uniform column extends the grid past it.
         
-        # Set up hover effects for all buttons
-        self.setup_button_hover_effects()
+        Returns:
+            The required (width, height) of the window in pixels
+        """
+        text_font = tkfont.Font(self, family=settings.KEY_FONT_FAMILY, size=settings.KEY_FONT_SIZE)
+        
+        # Font of every key style, as configured in _configure_styles
+        style_fonts = {}
+        for style in ('Key.TButton', 'Special.Key.TButton', 'Cancel.Key.TButton'):
+            style_fonts[style] = tkfont.Font(self, font=self._style.lookup(style, 'font'))
+        
+        # Space around the label of a key button on each side
+        chrome = (settings.KEY_BORDER_WIDTH +
+                  int(self._style.lookup('Key.TButton', 'focusthickness')))
+        
+        # Requested grid size of every key, margin included
+        key_sizes = []
+        for key, row, column, width in settings.KEY_TABLE:
+            font = style_fonts[self._key_style(key, width)]
+            key_req_width = (4 * width * font.measure('0') + 2 * (settings.KEY_PADDING_X + chrome) +
+                             2 * settings.KEY_MARGIN)
+            key_req_height = (font.metrics('linespace') + 2 * (settings.KEY_PADDING_Y + chrome) +
+                              2 * settings.KEY_MARGIN)
+            key_sizes.append((row, column, width, key_req_width, key_req_height))
+        
+        # Uniform columns are as wide as the widest single-column key
+        key_width = max(req_width for _, _, width, req_width, _ in key_sizes if width == 1)
+        grid_width = max(_MAX_COLS * key_width,
+                         max(column * key_width + req_width
+                             for _, column, _, req_width, _ in key_sizes))
+        
+        # Each row is as tall as its tallest key
+        row_heights = [0] * _NUM_ROWS
+        for row, _, _, _, req_height in key_sizes:
+            row_heights[row] = max(row_heights[row], req_height)
+        
+        # Entry line with its 1 pixel border, 1 pixel text padding and 10 pixel padding
+        text_display_height = text_font.metrics('linespace') + 2 + 2 + 20
+        
+        # Keyboard frame padding plus extra window padding (more vertical padding)
+        required_width = grid_width + 20 + 20
+        required_height = sum(row_heights) + text_display_height + 60
+        return required_width, required_height
 
-    def fade_in(self, current_alpha=0.0):
-        target_alpha = settings.WINDOW_TRANSPARENCY
-        if current_alpha < target_alpha:
-            current_alpha = min(current_alpha + 0.05, target_alpha)
-            self.attributes('-alpha', current_alpha)
-            self.after(10, lambda: self.fade_in(current_alpha))
+    def fade_in(self) -> None:
+        """Start the fade in effect from the first precomputed alpha step."""
+        if self._fade_job is not None:
+            # after_cancel() would also delete the reused _fade_cmd command
+            self.tk.call('after', 'cancel', self._fade_job)
+            self._fade_job = None
+        self._fade_idx = 0
+        self._fade_step()
+
+    def _fade_step(self) -> None:
+        """Apply the next alpha step and schedule the following one."""
+        self.attributes('-alpha', self._fade_steps[self._fade_idx])
+        self._fade_idx += 1
+        if self._fade_idx < len(self._fade_steps):
+            self._fade_job = self.tk.call('after', 10, self._fade_cmd)
+        else:
+            self._fade_job = None
         
+    def _configure_styles(self) -> None:
+        """
+        Configure the ttk styles shared by all key buttons.
+        
+        Key buttons highlight on hover ('active') and while they have the
+        navigation focus ('selected'). The caps lock key switches to
+        CapsOn.Key.TButton while caps lock is on. Special, Cancel and CapsOn
+        keys derive from Key.TButton.
+        """
+        self._style = ttk.Style(self)
+        self._style.theme_use('default')  # Theme that honors custom button colors
+        self._style.configure('Key.TButton',
+                              foreground=settings.KEY_TEXT_COLOR,
+                              background=settings.KEY_BACKGROUND_COLOR,
+                              font=(settings.KEY_FONT_FAMILY, settings.KEY_FONT_SIZE),
+                              padding=(settings.KEY_PADDING_X, settings.KEY_PADDING_Y),
+                              borderwidth=settings.KEY_BORDER_WIDTH,
+                              relief='flat',
+                              focusthickness=1,  # The default theme's focus ring width
+                              shiftrelief=0,  # Pressed keys stay flat, so reserve no shift space
+                              anchor='center')
+        self._style.map('Key.TButton',
+                        background=[('selected', settings.KEY_HOVER_COLOR),
+                                    ('active', settings.KEY_HOVER_COLOR)],
+                        relief=[('pressed', 'flat')])
+        self._style.configure('Special.Key.TButton',
+                              font=(settings.KEY_FONT_FAMILY, settings.SPECIAL_KEY_FONT_SIZE))
+        self._style.configure('Cancel.Key.TButton', background=settings.CANCEL_KEY_COLOR)
+        self._style.configure('CapsOn.Key.TButton', background=settings.KEY_HOVER_COLOR)
+    
     def create_keyboard(self):
-        for row_idx, row in enumerate(self.keys):
-            row_buttons = []
-            for col_idx, key in enumerate(row):
-                # Calculate button width for special keys
-                width = 1
-                if key == '⌫':
-                    width = settings.BACKSPACE_KEY_WIDTH
-                elif key == '↵':
-                    width = settings.ENTER_KEY_WIDTH
-                elif key == '⎵':
-                    width = settings.SPACE_KEY_WIDTH
-                elif key == '⨯':
-                    width = settings.CANCEL_KEY_WIDTH
-                
-                # Ensure width is an integer
-                width = int(width)
-                
-                # Create button with modern styling
-                font_size = settings.SPECIAL_KEY_FONT_SIZE if width > 1 else settings.KEY_FONT_SIZE
-                button_font = (settings.KEY_FONT_FAMILY, font_size)
-                
-                # Set background color based on key type
-                bg_color = settings.KEY_BACKGROUND_COLOR
-                if key == '⨯':
-                    bg_color = settings.CANCEL_KEY_COLOR
-                
-                # Calculate row width for centering
-                row_width = sum(self.get_key_width(k) for k in row)
-                max_width = 12  # Total grid columns
-                
-                # Center the M row and position Cancel key
-                if row_idx == 3:  # M row
-                    start_column = (max_width - row_width) // 2
-                    if key == '⨯':
-                        start_column = 10  # Align with return key
-                elif row_idx >= 4:  # Space row
-                    if key == '⎵':
-                        start_column = 1
-                        width = settings.SPACE_KEY_WIDTH
-                else:
-                    start_column = 0
-                
-                # Manually center Space and Cancel keys
-                if row_idx >= 4:  # For Space and Cancel rows
-                    total_cols = 12  # Total grid columns
-                    
-                    # Calculate positions for Space and Cancel buttons
-                    if key == '⎵':
-                        start_column = 1  # Start from column 1
-                        width = settings.SPACE_KEY_WIDTH
-                    elif key == '⨯':
-                        start_column = 9  # Position under the return key
-                        width = settings.CANCEL_KEY_WIDTH
-                    
-                    button = tk.Button(self.keyboard_frame, text=key,
-                                  command=lambda k=key: self.key_press(k),
-                                  bg=bg_color,
-                                  fg=settings.KEY_TEXT_COLOR,
-                                  activebackground=settings.KEY_HOVER_COLOR,
-                                  activeforeground=settings.KEY_TEXT_COLOR,
-                                  font=button_font,
-                                  relief='flat',
-                                  bd=settings.KEY_BORDER_WIDTH,
-                                  padx=settings.KEY_PADDING_X,
-                                  pady=settings.KEY_PADDING_Y,
-                                  width=4 if width == 1 else width * 4,  # Set fixed character width
-                                  highlightthickness=0)
-                    
-                    button.grid(row=row_idx + 1, 
-                            column=start_column,
-                            columnspan=width,
-                            padx=settings.KEY_MARGIN,  # Removed extra padding between buttons
-                            pady=settings.KEY_MARGIN,
-                            sticky='nsew')
-                    
-                    # Bind Enter key to Cancel button
-                    if key == '⨯':
-                        button.bind('<Return>', lambda e: self.key_press('⨯'))
-                    
-                    # Bind focus out event to reset button color
-                    button.bind('<FocusOut>', lambda e, b=button, c=bg_color: b.configure(bg=c))
-                else:
-                    # Original grid placement for other rows
-                    button = tk.Button(self.keyboard_frame, text=key,
-                                  command=lambda k=key: self.key_press(k),
-                                  bg=bg_color,
-                                  fg=settings.KEY_TEXT_COLOR,
-                                  activebackground=settings.KEY_HOVER_COLOR,
-                                  activeforeground=settings.KEY_TEXT_COLOR,
-                                  font=button_font,
-                                  relief='flat',
-                                  bd=settings.KEY_BORDER_WIDTH,
-                                  padx=settings.KEY_PADDING_X,
-                                  pady=settings.KEY_PADDING_Y,
-                                  width=4 if width == 1 else width * 4,  # Set fixed character width
-                                  highlightthickness=0)
-                    
-                    # Position buttons with special handling for Cancel key
-                    if row_idx == 3 and key == '⨯':
-                        button.grid(row=row_idx + 1,
-                                column=10,  # Align with return key
-                                columnspan=width,
-                                padx=settings.KEY_MARGIN,
-                                pady=settings.KEY_MARGIN,
-                                sticky='nsew')
-                    else:
-                        button.grid(row=row_idx + 1, 
-                                column=col_idx + start_column if row_idx == 3 else col_idx,
-                                columnspan=width,
-                                padx=settings.KEY_MARGIN,
-                                pady=settings.KEY_MARGIN,
-                                sticky='nsew')
-                
-                row_buttons.append(button)
-            self.buttons.append(row_buttons)
+        for key, row_idx, column, width in settings.KEY_TABLE:
+            if row_idx == len(self.buttons):
+                self.buttons.append([])
+                self.button_columns.append([])
+            
+            button = self._make_button(key, self._key_style(key, width), width)
+            self._place(button, row_idx + 1, column, width)
+            
+            self._key_of[button] = key
+            self._index_of[button] = len(self._flat)
+            self._flat.append(button)
+            if key.isalpha():
+                self._letter_keys[button] = key
+            
+            self.buttons[row_idx].append(button)
+            self.button_columns[row_idx].append(column)
         
         # Update the Caps button appearance based on its state
         caps_button = self.buttons[2][0]  # Assuming Caps is at row 2, column 0
         caps_button.configure(command=self.toggle_caps_lock)
     
+    def _build_focus_tables(self) -> None:
+        """
+        Precompute the neighbor of every button for keyboard navigation.
+        
+        Left and right wrap around within a row. Up and down wrap around
+        between rows and pick the button whose grid column is closest.
+        """
+        left, right, up, down = [], [], [], []
+        row_starts = []
+        start = 0
+        for row in self.buttons:
+            row_starts.append(start)
+            start += len(row)
+        
+        num_rows = len(self.buttons)
+        for row_idx, row_cols in enumerate(self.button_columns):
+            row_start = row_starts[row_idx]
+            row_len = len(row_cols)
+            for col_idx, current_x in enumerate(row_cols):
+                left.append(row_start + (col_idx - 1) % row_len)
+                right.append(row_start + (col_idx + 1) % row_len)
+                for table, new_row in ((up, (row_idx - 1) % num_rows),
+                                       (down, (row_idx + 1) % num_rows)):
+                    new_cols = self.button_columns[new_row]
+                    closest_col = min(range(len(new_cols)),
+                                      key=lambda col: abs(new_cols[col] - current_x))
+                    table.append(row_starts[new_row] + closest_col)
+        
+        self._dir_table = {'left': left, 'right': right, 'up': up, 'down': down}
+    
+    def _key_style(self, key: str, width: int) -> str:
+        """
+        Pick the button style based on key type.
+        
+        Args:
+            key: The key character or symbol
+            width: Width of the key in grid columns
+            
+        Returns:
+            Name of the ttk style of the key button
+        """
+        if key == '⨯':
+            return 'Cancel.Key.TButton'
+        elif width > 1:
+            return 'Special.Key.TButton'
+        return 'Key.TButton'
+    
+    def _make_button(self, key: str, style: str, width: int) -> ttk.Button:
+        """
+        Create a keyboard button with one of the shared key styles.
+        
+        Args:
+            key: The key character or symbol shown on the button
+            style: Name of the ttk style of the button
+            width: Width of the key in grid columns
+            
+        Returns:
+            The new, not yet placed, button widget
+        """
+        return ttk.Button(self.keyboard_frame, text=key,
+                          command=lambda k=key: self.key_press(k),
+                          style=style,
+                          width=4 if width == 1 else width * 4,  # Set fixed character width
+                          default='disabled',  # Reserve no space for a default ring
+                          takefocus=False)
+    
+    def _place(self, button: ttk.Button, row: int, column: int, span: int) -> None:
+        """
+        Place a keyboard button on the keyboard grid.
+        
+        Args:
+            button: The button widget to place
+            row: Grid row of the button
+            column: First grid column of the button
+            span: Number of grid columns the button covers
+        """
+        button.grid(row=row,
+                    column=column,
+                    columnspan=span,
+                    padx=settings.KEY_MARGIN,  # Removed extra padding between buttons
+                    pady=settings.KEY_MARGIN,
+                    sticky='nsew')
+    
     def key_press(self, key: str) -> None:
         """
         Handle key press events from the virtual keyboard.
@@ -309,44 +385,80 @@ class TransparentKeyboard(tk.Tk):
         Args:
             key: The key character or symbol that was pressed
         """
-        current_text = self.text_var.get()
+        # Ignore key presses queued while the keyboard is closing
+        if self._exiting:
+            return
         
-        if key == '⨯':  # Cancel
-            self.text_var.set('')  # Clear the text
-            self.destroy()
-        elif key == '⌫':  # Backspace
-            self.text_var.set(current_text[:-1])
-        elif key == '⎵':  # Space
-            self.text_var.set(current_text + ' ')
-        elif key.lower() == '⇪':  # Handle both '⇪' and '⇪'
-            self.toggle_caps_lock()
-        elif key == '↵':  # Return key
-            if current_text:
-                # Copy text to clipboard
-                pyperclip.copy(current_text)
-                
-                # Run subprocess to paste the text
-                try:
-                    subprocess.Popen(['xdotool', 'key', 'ctrl+v'])
-                except FileNotFoundError:
-                    print("Error: xdotool not found. Please install xdotool package.")
-                except Exception as e:
-                    print(f"Error running xdotool: {e}")
-            
-            self.destroy()
+        handler = self._handlers.get(key)
+        if handler is not None:
+            handler()
             return
         
         # Handle letter keys according to caps lock state
-        elif key.isalpha():
+        if key.isalpha():
             if self.caps_lock_on:
                 key = key.upper()
             else:
                 key = key.lower()
-            self.text_var.set(current_text + key)
         
-        # For other keys (symbols, numbers), add them as they are
-        elif not key in ['⌫', '⎵', '⨯', '↵', '⇪']:
-            self.text_var.set(current_text + key)
+        # Letters, symbols and numbers are added to the input text
+        self._set_text(self._get_text() + key)
+
+    def _backspace(self) -> None:
+        """Remove the last character of the input text."""
+        self._set_text(self._get_text()[:-1])
+
+    def _space(self) -> None:
+        """Add a space to the input text."""
+        self._set_text(self._get_text() + ' ')
+
+    def _get_text(self) -> str:
+        """Return the current input text, including updates not yet flushed."""
+        if self._pending_text is not None:
+            return self._pending_text
+        return self.text_var.get()
+
+    def _set_text(self, text: str) -> None:
+        """
+        Set the input text, deferring the Entry update to the next idle cycle.
+        
+        Several key presses handled within one event loop iteration only
+        cause a single text_var update and Entry redraw.
+        
+        Args:
+            text: The new input text
+        """
+        self._pending_text = text
+        if not self._flush_scheduled:
+            self._flush_scheduled = True
+            self.after_idle(self._flush_text)
+
+    def _flush_text(self) -> None:
+        """Write the pending input text to text_var."""
+        if self._pending_text is not None:
+            self.text_var.set(self._pending_text)
+            self._pending_text = None
+        self._flush_scheduled = False
+
+    def on_escape(self, event: tk.Event) -> None:
+        """Handle escape key press to close the window."""
+        self.destroy()
+
+    def _on_left(self, event: tk.Event) -> None:
+        """Move the keyboard focus left."""
+        self.move_focus('left')
+
+    def _on_right(self, event: tk.Event) -> None:
+        """Move the keyboard focus right."""
+        self.move_focus('right')
+
+    def _on_up(self, event: tk.Event) -> None:
+        """Move the keyboard focus up."""
+        self.move_focus('up')
+
+    def _on_down(self, event: tk.Event) -> None:
+        """Move the keyboard focus down."""
+        self.move_focus('down')
 
     def move_focus(self, direction: str) -> None:
         """
@@ -359,174 +471,112 @@ class TransparentKeyboard(tk.Tk):
             direction: Direction to move ('left', 'right', 'up', 'down')
         """
         # Remove focus from current button
-        self.reset_button_color(self.buttons[self.current_row][self.current_col],
-                              self.keys[self.current_row][self.current_col])
-        
-        # Calculate new position
-        if direction == 'left':
-            self.current_col = (self.current_col - 1) % len(self.buttons[self.current_row])
-        elif direction == 'right':
-            self.current_col = (self.current_col + 1) % len(self.buttons[self.current_row])
-        elif direction == 'up' or direction == 'down':
-            # Get current button's grid info
-            current_button = self.buttons[self.current_row][self.current_col]
-            current_x = current_button.grid_info()['column']
-            
-            # Calculate new row
-            new_row = (self.current_row - 1) if direction == 'up' else (self.current_row + 1)
-            new_row = new_row % len(self.buttons)
-            
-            # Find the closest button in the new row
-            closest_col = 0
-            min_distance = float('inf')
-            for col, button in enumerate(self.buttons[new_row]):
-                button_x = button.grid_info()['column']
-                distance = abs(button_x - current_x)
-                if distance < min_distance:
-                    min_distance = distance
-                    closest_col = col
-            
-            self.current_row = new_row
-            self.current_col = closest_col
+        self.reset_button_color(self._flat[self._focus_idx])
         
         # Set focus on new button
-        focused_button = self.buttons[self.current_row][self.current_col]
-        focused_button.configure(bg=settings.KEY_HOVER_COLOR)
+        self._focus_idx = self._dir_table[direction][self._focus_idx]
+        self._apply_focus()
+
+    def _apply_focus(self) -> None:
+        """Highlight the currently focused button."""
+        self._flat[self._focus_idx].state(['selected'])
     
     def activate_focused(self, event=None):
-        """Simulate clicking the currently focused button and ensure keyboard focus"""
-        # Ensure the keyboard window is raised and has focus
-        self.lift()  # Bring window to the top
-        self.focus_force()  # Force focus on the keyboard window
-        
-        button = self.buttons[self.current_row][self.current_col]
-        key = button.cget('text')  # Get the button's text
-        
-        # Handle Cancel button to exit the program
-        if key == '⨯':
-            self.destroy()
-            return
-        elif key == '↵':  # Return key
-            current_text = self.text_var.get()
-            if current_text:
-                # Copy text to clipboard
-                pyperclip.copy(current_text)
-                
-                # Run subprocess to paste the text
-                try:
-                    subprocess.Popen(['xdotool', 'key', 'ctrl+v'])
-                except Exception as e:
-                    print(f"Error running xdotool: {e}")
-            
-            self.destroy()
+        """Simulate clicking the currently focused button"""
+        self.key_press(self._key_of[self._flat[self._focus_idx]])
+    
+    def _cancel_and_exit(self) -> None:
+        """Discard the input text and close the window."""
+        if self._exiting:
             return
-        
-        # Handle caps lock toggle
-        if key.lower() == '⇪':  # Handle both '⇪' and '⇪'
-            self.toggle_caps_lock()
+        self._exiting = True
+        self.destroy()
+
+    def _commit_and_exit(self) -> None:
+        """Paste the input text, if any, into the focused window and close the keyboard."""
+        if self._exiting:
             return
-        
-        # Add the key's text to the input field
-        self.key_press(key)
-    
-    def get_key_width(self, key: str) -> int:
+        self._exiting = True
+        current_text = self._get_text()
+        if current_text:
+            # Copy text to clipboard and paste it
+            self._paste_and_exit(current_text)
+        else:
+            self.destroy()
+
+    def _paste_and_exit(self, text: str) -> None:
         """
-        Get the width (in grid columns) for a given key.
+        Copy text to the clipboard, paste it into the focused window and exit.
+        
+        The keyboard is hidden first so the previously focused window gets
+        the paste shortcut. Tk owns the clipboard contents, so the window is
+        only destroyed once the target had time to request them.
         
         Args:
-            key: The key character or symbol
-            
-        Returns:
-            The width of the key in grid columns
+            text: The text to paste
         """
-        if key == '⌫':
-            return settings.BACKSPACE_KEY_WIDTH
-        elif key == '↵':
-            return settings.ENTER_KEY_WIDTH
-        elif key == '⎵':
-            return settings.SPACE_KEY_WIDTH
-        elif key == '⨯':
-            return settings.CANCEL_KEY_WIDTH
-        return 1
-
-    def reset_button_color(self, button: tk.Button, key: str) -> None:
+        self.clipboard_clear()
+        self.clipboard_append(text)
+        self.withdraw()
+        self.after(settings.PASTE_DELAY_MS, self._send_paste_and_exit)
+
+    def _send_paste_and_exit(self) -> None:
+        """Send Ctrl+V through the XTEST extension, then close the window."""
+        try:
+            if self._xdisplay is None:
+                self._xdisplay = xdisplay.Display()
+                self._paste_keycodes = (
+                    self._xdisplay.keysym_to_keycode(XK.XK_Control_L),
+                    self._xdisplay.keysym_to_keycode(XK.XK_v))
+            ctrl_keycode, v_keycode = self._paste_keycodes
+            xtest.fake_input(self._xdisplay, X.KeyPress, ctrl_keycode)
+            xtest.fake_input(self._xdisplay, X.KeyPress, v_keycode)
+            xtest.fake_input(self._xdisplay, X.KeyRelease, v_keycode)
+            xtest.fake_input(self._xdisplay, X.KeyRelease, ctrl_keycode)
+            self._xdisplay.sync()
+        except Exception as e:
+            print(f"Error sending paste shortcut: {e}")
+        
+        # Keep serving the clipboard until the target window has read it
+        self.after(settings.CLIPBOARD_HOLD_MS, self.destroy)
+
+    def reset_button_color(self, button: ttk.Button) -> None:
         """
-        Reset a button's background color to its default state.
+        Remove the focus highlight from a button.
         
         Args:
             button: The button widget to reset
-            key: The key character or symbol of the button
         """
-        if key == '⨯':
-            button.configure(bg=settings.CANCEL_KEY_COLOR)
-        else:
-            button.configure(bg=settings.KEY_BACKGROUND_COLOR)
+        button.state(['!selected'])
 
     def toggle_caps_lock(self) -> None:
         """
         Toggle the caps lock state and update the keyboard layout.
         
         Updates the caps lock button appearance and converts all letter keys
-        to their appropriate case.
+        to their appropriate case. The caps lock button stays highlighted
+        while caps lock is on; turning it off moves the focus onto it.
         """
         self.caps_lock_on = not self.caps_lock_on
         caps_button = self.buttons[2][0]  # Caps is at row 2, column 0
         
         if self.caps_lock_on:
-            caps_button.configure(text='⇪', bg=settings.KEY_HOVER_COLOR)
+            caps_button.configure(style='CapsOn.Key.TButton')
         else:
-            caps_button.configure(text='⇪', bg=settings.KEY_BACKGROUND_COLOR)
-            self.current_row = 2
-            self.current_col = 0
+            caps_button.configure(style='Key.TButton')
+            self.reset_button_color(self._flat[self._focus_idx])
+            self._focus_idx = self._index_of[caps_button]
+            self._apply_focus()
             
         self.update_keyboard_layout()
 
-    def setup_button_hover_effects(self) -> None:
-        """Set up mouse hover effects for all keyboard buttons."""
-        for row in self.buttons:
-            for button in row:
-                button.bind('<Enter>', lambda e, btn=button: self.on_button_enter(btn))
-                button.bind('<Leave>', lambda e, btn=button: self.on_button_leave(btn))
-
-    def on_button_enter(self, button: tk.Button) -> None:
-        """
-        Handle mouse enter event for buttons.
-        
-        Args:
-            button: The button that triggered the event
-        """
-        if (button != self.buttons[self.current_row][self.current_col] and 
-            button != self.buttons[2][0]):  # Not current focus or Caps Lock
-            button.configure(bg=settings.KEY_HOVER_COLOR)
-
-    def on_button_leave(self, button: tk.Button) -> None:
-        """
-        Handle mouse leave event for buttons.
-        
-        Args:
-            button: The button that triggered the event
-        """
-        if (button != self.buttons[self.current_row][self.current_col] and 
-            button != self.buttons[2][0]):  # Not current focus or Caps Lock
-            button.configure(bg=settings.KEY_BACKGROUND_COLOR)
-
     def update_keyboard_layout(self):
-        """Update the keyboard layout based on caps lock state"""
-        for row_idx, row in enumerate(self.buttons):
-            for col_idx, button in enumerate(row):
-                # Update button text based on caps lock state
-                key_text = button.cget('text')
-                if key_text.isalpha():
-                    if self.caps_lock_on:
-                        button.configure(text=key_text.upper())
-                    else:
-                        button.configure(text=key_text.lower())
-                
-                # Set button color
-                if row_idx == self.current_row and col_idx == self.current_col:
-                    button.configure(bg=settings.KEY_HOVER_COLOR)
-                else:
-                    button.configure(bg=settings.KEY_BACKGROUND_COLOR)
+        """Update the letter key labels based on caps lock state"""
+        for button, key in self._letter_keys.items():
+            if self.caps_lock_on:
+                button.configure(text=key.upper())
+            else:
+                button.configure(text=key.lower())
 
     def start_drag(self, event: tk.Event) -> None:
         """
@@ -546,7 +596,8 @@ class TransparentKeyboard(tk.Tk):
         """
         Handle window dragging motion.
         
-        Updates the window position based on mouse movement.
+        Updates the window position based on mouse movement. Motion events
+        arriving within one event loop iteration only move the window once.
         
         Args:
             event: The mouse motion event
@@ -561,8 +612,19 @@ class TransparentKeyboard(tk.Tk):
             x = self.winfo_x() + dx
             y = self.winfo_y() + dy
             
-            # Move the window
+            # Move the window on the next idle cycle
+            self._pending_geom = (x, y)
+            if not self._geom_scheduled:
+                self._geom_scheduled = True
+                self.after_idle(self._flush_geom)
+
+    def _flush_geom(self) -> None:
+        """Move the window to the pending drag position."""
+        if self._pending_geom is not None:
+            x, y = self._pending_geom
             self.geometry(f"+{x}+{y}")
+            self._pending_geom = None
+        self._geom_scheduled = False
 
     def stop_drag(self, event: tk.Event) -> None:
         """
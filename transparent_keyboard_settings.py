@@ -1,6 +1,7 @@
 # Keyboard layout settings
-KEYBOARD_WIDTH_RATIO = 0.8  # Ratio of screen width
-KEYBOARD_HEIGHT_RATIO = 0.4  # Ratio relative to keyboard width
+# Unused: the window is sized to fit the keys (see _required_size)
+KEYBOARD_WIDTH_RATIO = 0.8  # Ratio of screen width (unused)
+KEYBOARD_HEIGHT_RATIO = 0.4  # Ratio relative to keyboard width (unused)
 
 # Window settings
 WINDOW_TRANSPARENCY = 0.95
@@ -9,7 +10,7 @@ WINDOW_BACKGROUND_COLOR = '#1B1B2E'  # Stremio's deep purple/navy background
 # Key appearance
 KEY_BACKGROUND_COLOR = '#282838'  # Slightly lighter than background
 KEY_HOVER_COLOR = '#4157FF'  # Stremio's vibrant blue accent
-KEY_ACTIVE_COLOR = '#3346CC'  # Slightly darker blue for active state
+KEY_ACTIVE_COLOR = '#3346CC'  # Slightly darker blue for active state (unused)
 KEY_TEXT_COLOR = '#FFFFFF'  # White text
 
 # Special button colors
@@ -24,9 +25,9 @@ SPECIAL_KEY_FONT_SIZE = 28  # Updated to match KEY_FONT_SIZE
 SPACE_KEY_WIDTH = 8  # Made wider to balance layout
 BACKSPACE_KEY_WIDTH = 2
 ENTER_KEY_WIDTH = 2
-TAB_KEY_WIDTH = 3      # Made wider for text visibility
+TAB_KEY_WIDTH = 3      # Made wider for text visibility (unused, no Tab key)
 CANCEL_KEY_WIDTH = 1  # Reduced from 4 to 3
-ACTION_KEY_WIDTH = 6  # Width for Done/Cancel buttons
+ACTION_KEY_WIDTH = 6  # Width for Done/Cancel buttons (unused)
 
 # Padding and spacing
 KEY_PADDING_X = 10  # Slightly reduced for better text fit
@@ -35,5 +36,42 @@ KEY_MARGIN = 2      # Very small margin for tight spacing
 
 # Border settings
 KEY_BORDER_WIDTH = 0  # No border for modern look
-KEY_BORDER_COLOR = '#000000'  # Black border color
-KEY_BORDER_RADIUS = 3  # Slightly rounded corners
+KEY_BORDER_COLOR = '#000000'  # Black border color (unused)
+KEY_BORDER_RADIUS = 3  # Slightly rounded corners (unused)
+
+# Paste settings
+PASTE_DELAY_MS = 50  # Wait after hiding the keyboard before sending Ctrl+V
+CLIPBOARD_HOLD_MS = 500  # Keep serving the clipboard after pasting before exiting
+
+# Key layout
+KEY_GRID_COLUMNS = 12  # Total grid columns
+KEY_WIDTHS = {  # Width (in grid columns) of keys wider than one column, used by KEY_TABLE
+    '⌫': BACKSPACE_KEY_WIDTH,
+    '↵': ENTER_KEY_WIDTH,
+    '⎵': SPACE_KEY_WIDTH,
+    '⨯': CANCEL_KEY_WIDTH,
+}
+
+
+def _key(key, row, column):
+    """Build the layout record of one key, taking its width from KEY_WIDTHS."""
+    return ((key, row, column, KEY_WIDTHS.get(key, 1)),)
+
+
+def _key_run(keys, row, start_column=0):
+    """Lay out single-column keys side by side, starting at start_column."""
+    return tuple((key, row, start_column + i, 1) for i, key in enumerate(keys))
+
+
+# Simplified QWERTY layout as (key, row, column, width) records in row-major order.
+# Letters are lowercase, matching the initial caps lock state.
+# The M row is centered and Cancel sits under the return key.
+_M_ROW_KEYS = 'zxcvbnm'
+KEY_TABLE = (
+    _key_run('1234567890', 0) + _key('⌫', 0, 10)
+    + _key_run('qwertyuiop', 1)
+    + _key('⇪', 2, 0) + _key_run('asdfghjkl', 2, 1) + _key('↵', 2, 10)
+    + _key_run(_M_ROW_KEYS, 3, (KEY_GRID_COLUMNS - len(_M_ROW_KEYS) - KEY_WIDTHS['⨯']) // 2)
+    + _key('⨯', 3, 10)
+    + _key('⎵', 4, 1)
+)